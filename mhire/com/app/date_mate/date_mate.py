@@ -5,6 +5,13 @@ from typing import Dict, List, Any, Optional
 from mhire.com.config.config import Config
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from mhire.com.core.metrics import LLM_FALLBACKS, LLM_REQUEST_SECONDS, record_llm_tokens
+from mhire.com.core.resilience import LLMUnavailable, ResilientCaller
+from collections import OrderedDict
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 class DateMate:
     def __init__(self, config: Config):
@@ -13,6 +20,18 @@ class DateMate:
         if not self.api_key:
             raise Exception("OpenAI API key is required")
         self.model_name = "gpt-3.5-turbo"
+        # Timeout, hedging and circuit breaker around the upstream LLM
+        self.llm_caller = ResilientCaller(
+            "date_mate",
+            timeout=self.config.LLM_TIMEOUT_SECONDS,
+            hedge_percentile=self.config.LLM_HEDGE_PERCENTILE,
+            hedge_ratio=self.config.LLM_HEDGE_RATIO,
+            failure_threshold=self.config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.config.CIRCUIT_RESET_SECONDS
+        )
+        # Recent replies per (user, message), served when the LLM is unavailable
+        self.response_cache: OrderedDict = OrderedDict()
+        self.response_cache_size = 1024
         self.app = FastAPI(
             title="Date Mate API",
             description="API for the Date Mate dating advisor chatbot",
@@ -185,6 +204,12 @@ Remember that your primary purpose is to provide authentic conversation, compani
 
     user_sessions: Dict[str, ChatState] = {}
 
+    # Served when the LLM is unavailable and no cached reply exists
+    FALLBACK_RESPONSE = (
+        "Desole, j'ai un petit souci pour te repondre en ce moment. "
+        "Peux-tu me reecrire dans quelques instants ?"
+    )
+
     def get_chat_model(self):
         return ChatOpenAI(
             model=self.model_name,
@@ -193,6 +218,35 @@ Remember that your primary purpose is to provide authentic conversation, compani
             max_tokens=1024
         )
 
+    def _response_cache_key(self, user_id: str, message: str):
+        return user_id, " ".join(message.lower().split())
+
+    def remember_response(self, user_id: str, message: str, response: str):
+        key = self._response_cache_key(user_id, message)
+        self.response_cache[key] = response
+        self.response_cache.move_to_end(key)
+        if len(self.response_cache) > self.response_cache_size:
+            self.response_cache.popitem(last=False)
+
+    def fallback_response(self, user_id: str, message: str) -> str:
+        """Cached reply to the same message from this user, or a generic apology"""
+        cached = self.response_cache.get(self._response_cache_key(user_id, message))
+        LLM_FALLBACKS.labels(service="date_mate", source="cache" if cached else "static").inc()
+        return cached or self.FALLBACK_RESPONSE
+
+    async def invoke_chat_model(self, llm: ChatOpenAI, langchain_messages: list) -> str:
+        """Single upstream chat completion"""
+        llm_start = time.perf_counter()
+        try:
+            ai_response = await llm.ainvoke(langchain_messages)
+        except Exception:
+            LLM_REQUEST_SECONDS.labels(service="date_mate", outcome="error").observe(time.perf_counter() - llm_start)
+            raise
+        LLM_REQUEST_SECONDS.labels(service="date_mate", outcome="success").observe(time.perf_counter() - llm_start)
+        usage = getattr(ai_response, "usage_metadata", None) or {}
+        record_llm_tokens("date_mate", usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        return ai_response.content
+
     def initialize_chat_state(self, user_id: str) -> ChatState:
         if user_id not in self.user_sessions:
             self.user_sessions[user_id] = self.ChatState(
@@ -206,7 +260,8 @@ Remember that your primary purpose is to provide authentic conversation, compani
         @self.app.post("/chat", response_model=self.ChatResponse)
         async def chat(request: self.ChatRequest):
             chat_state = self.initialize_chat_state(request.user_id)
-            chat_state.messages.append({"role": "user", "content": request.message})
+            user_message = {"role": "user", "content": request.message}
+            chat_state.messages.append(user_message)
             if "recent_topics" in chat_state.context:
                 potential_topics = ["date", "match", "profile", "advice", "relationship"]
                 for topic in potential_topics:
@@ -222,8 +277,17 @@ Remember that your primary purpose is to provide authentic conversation, compani
                     langchain_messages.append(HumanMessage(content=msg["content"]))
                 elif msg["role"] == "assistant":
                     langchain_messages.append(AIMessage(content=msg["content"]))
-            ai_response = llm.invoke(langchain_messages)
-            assistant_message = ai_response.content
+            try:
+                assistant_message = await self.llm_caller.call(
+                    lambda: self.invoke_chat_model(llm, langchain_messages)
+                )
+            except LLMUnavailable as e:
+                # Degrade gracefully; neither the message nor the fallback goes into the history
+                logger.warning(f"Serving fallback chat response: {e}")
+                # Remove this exact message; a concurrent turn may have appended after it
+                chat_state.messages[:] = [msg for msg in chat_state.messages if msg is not user_message]
+                return self.ChatResponse(response=self.fallback_response(request.user_id, request.message))
+            self.remember_response(request.user_id, request.message, assistant_message)
             chat_state.messages.append({"role": "assistant", "content": assistant_message})
             self.user_sessions[request.user_id] = chat_state
             return self.ChatResponse(response=assistant_message)
\ No newline at end of file
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 from mhire.com.app.date_mate.date_mate import DateMate
 from mhire.com.config.config import Config
+from mhire.com.core.admission import AdmissionController, request_priority
 
 config = Config()
 router = APIRouter(
@@ -10,11 +11,15 @@ router = APIRouter(
 )
 
 date_mate_service = DateMate(config)
+chat_admission = AdmissionController(
+    "date-mate/chat",
+    max_concurrency=config.CHAT_MAX_CONCURRENCY,
+    max_queue=config.CHAT_MAX_QUEUE,
+    max_wait=config.CHAT_MAX_WAIT_SECONDS,
+    initial_service_time=config.CHAT_EXPECTED_SERVICE_SECONDS,
+)
 
 @router.post("/chat")
-async def chat(request: date_mate_service.ChatRequest):
-    try:
-        response = await date_mate_service.app.router.routes[-1].endpoint(request)
-        return response
-    except DateMateError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def chat(request: date_mate_service.ChatRequest, priority: int = Depends(request_priority)):
+    async with chat_admission.slot(priority):
+        return await date_mate_service.app.router.routes[-1].endpoint(request)
@@ -8,6 +8,8 @@ import logging
 import time
 import asyncio
 import math
+from mhire.com.app.match_making.profile_index import ProfileSimilarityIndex
+from mhire.com.core.metrics import MATCH_STAGE_SECONDS, record_cache_lookup
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -50,6 +52,11 @@ class LLMMatchMaking:
         # Add caching to reduce API calls
         self.score_cache = {}
         self.description_cache = {}
+
+        # Local profile vectors (hobbies, goals, age band) used as an extra ranking signal
+        self.profile_index = ProfileSimilarityIndex(rescan_interval=config.SIMILARITY_RESCAN_SECONDS)
+        self.similarity_top_k = config.SIMILARITY_TOP_K
+        self.similarity_budget = config.SIMILARITY_BUDGET_MS / 1000
     
     def get_user_data(self, user_id: str) -> Dict[str, Any]:
         url = f"{self.base_url}{user_id}"
@@ -71,7 +78,9 @@ class LLMMatchMaking:
         # Check cache first
         cache_key = f"{my_data.get('id')}:{other_user.get('id')}"
         if cache_key in self.description_cache:
+            record_cache_lookup("match_description", hit=True)
             return self.description_cache[cache_key]
+        record_cache_lookup("match_description", hit=False)
             
         # Not needed anymore since we remove this from response
         # We'll return a placeholder instead of making an API call
@@ -81,9 +90,11 @@ class LLMMatchMaking:
         self.description_cache[cache_key] = description
         return description
     
-    def calculate_llm_match_score(self, my_data: Dict[str, Any], other_user: Dict[str, Any], strict: bool = True) -> float:
+    def calculate_llm_match_score(self, my_data: Dict[str, Any], other_user: Dict[str, Any], strict: bool = True,
+                                  similarity: float = 0.0) -> float:
         """
-        Calculate match score between users based on gender preferences and location
+        Calculate match score between users based on gender preferences, location
+        and profile similarity (cosine similarity from the profile index, 0 if not a top-k neighbour)
         """
         # Check basic compatibility first
         if not self.is_compatible(my_data, other_user, strict):
@@ -118,12 +129,16 @@ class LLMMatchMaking:
             elif distance <= 100:
                 distance_score = max(0, 100 * (1 - (distance - 5) / 95))
     
-        # Combine scores (gender preference and distance)
-        # Weight: 70% gender preference, 30% distance
-        score = (0.7 * gender_preference_bonus) + (0.3 * distance_score)
+        # Profile similarity score: 0-100 from hobbies, relationship goals and age band
+        similarity_score = 100 * max(0.0, similarity)
+
+        # Combine scores: 70% gender preference + 30% distance, plus similarity
+        # as an additive bonus of up to 30 points on top of that
+        score = (0.7 * gender_preference_bonus) + (0.3 * distance_score) + (0.3 * similarity_score)
     
         logger.info(f"Match score for {other_user.get('name')}: total={score:.1f} "
-                    f"(gender_bonus={gender_preference_bonus}, distance_score={distance_score:.1f})")
+                    f"(gender_bonus={gender_preference_bonus}, distance_score={distance_score:.1f}, "
+                    f"similarity_score={similarity_score:.1f})")
     
         return score
     
@@ -164,7 +179,8 @@ class LLMMatchMaking:
         logger.info(f"Starting match-making process for user {user_id}")
         
         # Get user data
-        data = self.get_user_data(user_id)
+        with MATCH_STAGE_SECONDS.labels(stage="user_fetch").time():
+            data = self.get_user_data(user_id)
         
         if not data.get("success"):
             raise Exception("Failed to get user data")
@@ -176,8 +192,16 @@ class LLMMatchMaking:
         logger.info(f"Found {len(all_users)} total users in database")
         logger.info(f"My gender preference: {my_data.get('interestedIn')}")
         
+        # Look up profiles similar to mine within the latency budget
+        with MATCH_STAGE_SECONDS.labels(stage="similarity").time():
+            similarity = self._find_similar(my_data, all_users)
+        
+        # Filtering and scoring time summed over both passes, recorded once per request
+        stage_timings = {"filtering": 0.0, "scoring": 0.0}
+        
         # First try with strict matching to get exact gender preference matches
-        strict_matches = self._find_matches(user_id, my_data, all_users, strict=True)
+        strict_matches = self._find_matches(user_id, my_data, all_users, strict=True, similarity=similarity,
+                                            stage_timings=stage_timings)
         logger.info(f"Found {len(strict_matches)} strict matches")
         
         # If we need more matches, try looser criteria
@@ -185,7 +209,8 @@ class LLMMatchMaking:
         if len(strict_matches) < limit:
             logger.info(f"Finding more matches with looser criteria")
             # Only get enough additional matches to reach the limit
-            looser_matches = self._find_matches(user_id, my_data, all_users, strict=False)
+            looser_matches = self._find_matches(user_id, my_data, all_users, strict=False, similarity=similarity,
+                                                stage_timings=stage_timings)
             
             # Filter out duplicates
             existing_ids = {match.get("id") for match in matches}
@@ -195,8 +220,12 @@ class LLMMatchMaking:
             matches.extend(additional_matches[:limit - len(matches)])
             logger.info(f"Added {min(limit - len(strict_matches), len(additional_matches))} additional matches")
             
+        for stage, elapsed in stage_timings.items():
+            MATCH_STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+            
         # Sort by match score (highest first)
-        matches.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
+        with MATCH_STAGE_SECONDS.labels(stage="sorting").time():
+            matches.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
         
         # Trim to limit
         result = matches[:min(limit, len(matches))]
@@ -208,16 +237,40 @@ class LLMMatchMaking:
         
         return result
     
-    def _find_matches(self, user_id: str, my_data: Dict[str, Any], all_users: List[Dict[str, Any]], strict: bool = True) -> List[Dict[str, Any]]:
+    def _find_similar(self, my_data: Dict[str, Any], all_users: List[Dict[str, Any]]) -> Dict[str, float]:
         """
-        Internal helper to find matches with given strictness level using LLM
+        Sync changed profiles into the similarity index and return the top-k
+        neighbours of the current user, all within the per-request latency budget
         """
+        start_time = time.perf_counter()
+        try:
+            # Index maintenance gets at most half the budget so the query always has time left
+            updated = self.profile_index.sync(all_users, deadline=start_time + self.similarity_budget / 2)
+            similarity = self.profile_index.similar(my_data, self.similarity_top_k,
+                                                    deadline=start_time + self.similarity_budget)
+        except Exception as e:
+            # Similarity is only an extra signal, never fail match-making because of it
+            logger.error(f"Profile similarity lookup failed: {e}")
+            return {}
+        logger.info(f"Profile index: {updated} profiles updated, {len(similarity)} similar candidates")
+        return similarity
+    
+    def _find_matches(self, user_id: str, my_data: Dict[str, Any], all_users: List[Dict[str, Any]], strict: bool = True,
+                      similarity: Dict[str, float] = None,
+                      stage_timings: Dict[str, float] = None) -> List[Dict[str, Any]]:
+        """
+        Internal helper to find matches with given strictness level using LLM.
+        Filtering and scoring durations are added to `stage_timings` when given.
+        """
+        similarity = similarity or {}
+        stage_timings = stage_timings if stage_timings is not None else {}
         matches = []
         skipped_count = 0
         processed_count = 0
         max_to_process = 50  # Limit processing to improve performance
         
         # First filter to prioritize matches based on gender preference
+        filter_start = time.perf_counter()
         filtered_users = []
         my_interest = my_data.get("interestedIn")
         
@@ -236,6 +289,16 @@ class LLMMatchMaking:
             # No specific preference, process all
             filtered_users = [u for u in all_users if u.get("id") != user_id]
         
+        # Within the preferred and other groups, look at the most similar profiles first
+        if similarity:
+            preferred_gender = {"GIRLS": "FEMALE", "BOYS": "MALE"}.get(my_interest)
+            filtered_users.sort(key=lambda u: (
+                preferred_gender is not None and u.get("gender") != preferred_gender,
+                -similarity.get(u.get("id"), 0.0)
+            ))
+        stage_timings["filtering"] = stage_timings.get("filtering", 0.0) + time.perf_counter() - filter_start
+        
+        scoring_start = time.perf_counter()
         for user in filtered_users:
             if processed_count >= max_to_process:
                 logger.info(f"Reached processing limit of {max_to_process} users")
@@ -244,7 +307,8 @@ class LLMMatchMaking:
             processed_count += 1
             
             # Calculate match score using LLM
-            score = self.calculate_llm_match_score(my_data, user, strict=strict)
+            score = self.calculate_llm_match_score(my_data, user, strict=strict,
+                                                   similarity=similarity.get(user.get("id"), 0.0))
             
             if score > 0:
                 user_with_score = user.copy()
@@ -253,6 +317,7 @@ class LLMMatchMaking:
                 matches.append(user_with_score)
             else:
                 skipped_count += 1
+        stage_timings["scoring"] = stage_timings.get("scoring", 0.0) + time.perf_counter() - scoring_start
                 
         logger.info(f"Processed {processed_count} users, skipped {skipped_count} due to incompatibility or low scores")
         return matches
@@ -0,0 +1,408 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Profile fields may come from the user database (camelCase) or from UserProfile (snake_case)
+HOBBY_KEYS = ("hobbies", "interests")
+GOAL_KEYS = ("relationshipGoals", "relationship_goals", "relationshipGoal")
+AGE_KEYS = ("age",)
+BIRTH_DATE_KEYS = ("dateOfBirth", "birthDate", "dob")
+
+PROFILE_KEYS = HOBBY_KEYS + GOAL_KEYS + AGE_KEYS + BIRTH_DATE_KEYS
+# When the user data carries a modification timestamp it is the only field we need to compare
+UPDATED_AT_KEYS = ("updatedAt", "updated_at")
+
+AGE_BAND_WIDTH = 5
+
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return re.split(r"[,;/]", value)
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value if item]
+    return [str(value)]
+
+
+def _normalize(token: str) -> str:
+    return " ".join(token.lower().split())
+
+
+def _first(profile: Dict[str, Any], keys: Iterable[str]) -> Any:
+    for key in keys:
+        value = profile.get(key)
+        if value:
+            return value
+    return None
+
+
+def _profile_age(profile: Dict[str, Any]) -> Optional[int]:
+    age = _first(profile, AGE_KEYS)
+    if age is not None:
+        match = re.search(r"\d+", str(age))
+        return int(match.group()) if match else None
+
+    birth_date = _first(profile, BIRTH_DATE_KEYS)
+    if not birth_date:
+        return None
+    try:
+        born = datetime.fromisoformat(str(birth_date).replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+    today = date.today()
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def profile_features(profile: Dict[str, Any]) -> Tuple[Tuple[str, float], ...]:
+    """
+    Extract weighted features used for similarity: hobbies, relationship goals and age band.
+    The result is sorted so it can double as a fingerprint for change detection.
+    """
+    features: Dict[str, float] = {}
+
+    for hobby in _as_list(_first(profile, HOBBY_KEYS)):
+        hobby = _normalize(hobby)
+        if hobby:
+            features[f"hobby:{hobby}"] = 1.0
+
+    goals = _first(profile, GOAL_KEYS)
+    for goal in _as_list(goals):
+        goal = _normalize(goal)
+        if goal:
+            features[f"goal:{goal}"] = 1.5
+            # Individual words let "long term relationship" and "long-term" overlap
+            for word in re.findall(r"[a-z]{3,}", goal):
+                features.setdefault(f"goal_word:{word}", 0.5)
+
+    age = _profile_age(profile)
+    if age is not None:
+        band = age // AGE_BAND_WIDTH * AGE_BAND_WIDTH
+        features[f"age:{band}"] = 1.0
+        # Neighbouring bands give a softer signal for ages near a band edge
+        features[f"age:{band - AGE_BAND_WIDTH}"] = 0.5
+        features[f"age:{band + AGE_BAND_WIDTH}"] = 0.5
+
+    return tuple(sorted(features.items()))
+
+
+def hash_features(features: Iterable[Tuple[str, float]], dim: int) -> Optional[np.ndarray]:
+    """
+    Hashed bag-of-features vector, L2 normalised.
+    A stable hash is used so vectors are identical across processes and restarts.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[bucket] += sign * weight
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        return None
+    return vector / norm
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbour index over unit vectors (cosine similarity).
+
+    Vectors are assigned to the closest of `n_lists` k-means centroids and a query only
+    scans the `n_probe` closest lists. Until enough vectors exist to train the centroids
+    everything lives in a single list and search is exact. Centroids are retrained in a
+    background thread when the index has doubled in size since the last training, so
+    upserts and searches never pay for k-means.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 16, n_probe: int = 4, kmeans_iterations: int = 8):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+
+        self.centroids: Optional[np.ndarray] = None
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._assignment: Dict[str, int] = {}
+        self._lists: List[Dict[str, np.ndarray]] = [{}]
+        # Per-list (ids, matrix) snapshots, rebuilt lazily after a list changes
+        self._packed: Dict[int, Tuple[List[str], np.ndarray]] = {}
+        self._trained_size = 0
+        self._training = False
+        # Ids upserted or removed while a background training runs on a snapshot
+        self._changed_while_training: set = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._vectors
+
+    def upsert(self, item_id: str, vector: np.ndarray):
+        with self._lock:
+            self._remove(item_id)
+            self._vectors[item_id] = vector
+            list_id = self._closest_list(vector)
+            self._assignment[item_id] = list_id
+            self._lists[list_id][item_id] = vector
+            self._packed.pop(list_id, None)
+            if self._training:
+                self._changed_while_training.add(item_id)
+            self._maybe_start_training()
+
+    def remove(self, item_id: str):
+        with self._lock:
+            self._remove(item_id)
+            if self._training:
+                self._changed_while_training.add(item_id)
+
+    def search(self, query: np.ndarray, k: int, deadline: Optional[float] = None,
+               exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Return up to k (id, similarity) pairs, best first.
+        Lists are scanned closest first and scanning stops once `deadline`
+        (a time.perf_counter() value) has passed, after at least one list.
+        """
+        with self._lock:
+            if not self._vectors or k <= 0:
+                return []
+
+            if self.centroids is None:
+                probe_order = [0]
+            else:
+                centroid_scores = self.centroids @ query
+                probe_order = np.argsort(-centroid_scores)[:self.n_probe].tolist()
+
+            candidate_ids: List[str] = []
+            candidate_scores: List[np.ndarray] = []
+            for position, list_id in enumerate(probe_order):
+                if position > 0 and deadline is not None and time.perf_counter() > deadline:
+                    logger.info(f"Similarity search stopped after {position} of {len(probe_order)} lists (latency budget)")
+                    break
+                ids, matrix = self._pack(list_id)
+                if not ids:
+                    continue
+                candidate_ids.extend(ids)
+                candidate_scores.append(matrix @ query)
+
+        if not candidate_ids:
+            return []
+        scores = np.concatenate(candidate_scores)
+        top = min(len(scores), k + 1)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        results = [(candidate_ids[i], float(scores[i])) for i in best if candidate_ids[i] != exclude]
+        return results[:k]
+
+    def _remove(self, item_id: str):
+        list_id = self._assignment.pop(item_id, None)
+        if list_id is None:
+            return
+        self._vectors.pop(item_id, None)
+        self._lists[list_id].pop(item_id, None)
+        self._packed.pop(list_id, None)
+
+    def _closest_list(self, vector: np.ndarray) -> int:
+        if self.centroids is None:
+            return 0
+        return int(np.argmax(self.centroids @ vector))
+
+    def _pack(self, list_id: int) -> Tuple[List[str], np.ndarray]:
+        packed = self._packed.get(list_id)
+        if packed is None:
+            members = self._lists[list_id]
+            ids = list(members.keys())
+            matrix = np.stack([members[i] for i in ids]) if ids else np.empty((0, self.dim), dtype=np.float32)
+            packed = (ids, matrix)
+            self._packed[list_id] = packed
+        return packed
+
+    def _maybe_start_training(self):
+        """Start a background training on a snapshot of the vectors if the index has grown enough"""
+        if self._training or len(self._vectors) < max(self.n_lists * 8, 2 * self._trained_size):
+            return
+        self._training = True
+        self._changed_while_training = set()
+        snapshot = dict(self._vectors)
+        threading.Thread(target=self._train, args=(snapshot,), name="profile-index-training", daemon=True).start()
+
+    def _train(self, snapshot: Dict[str, np.ndarray]):
+        try:
+            self._train_snapshot(snapshot)
+        except Exception as e:
+            logger.error(f"Profile index training failed: {e}")
+        finally:
+            with self._lock:
+                self._training = False
+
+    def _train_snapshot(self, snapshot: Dict[str, np.ndarray]):
+        ids = list(snapshot.keys())
+        data = np.stack([snapshot[i] for i in ids])
+        n_lists = min(self.n_lists, len(ids))
+
+        # Spherical k-means seeded with an evenly spaced sample. Centroid sums use a
+        # one-hot matrix product so the heavy work runs in numpy without holding the GIL.
+        centroids = data[np.linspace(0, len(ids) - 1, n_lists).astype(int)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            one_hot = np.zeros((len(ids), n_lists), dtype=np.float32)
+            one_hot[np.arange(len(ids)), labels] = 1.0
+            sums = one_hot.T @ data
+            norms = np.linalg.norm(sums, axis=1)
+            nonempty = norms > 0
+            centroids[nonempty] = sums[nonempty] / norms[nonempty, None]
+            time.sleep(0)
+        labels = np.argmax(data @ centroids.T, axis=1)
+
+        # Build the new lists off the lock; only the swap below blocks readers.
+        # Yield regularly so request threads are not starved by this Python loop.
+        lists: List[Dict[str, np.ndarray]] = [{} for _ in range(n_lists)]
+        assignment: Dict[str, int] = {}
+        for position, (item_id, label) in enumerate(zip(ids, labels.tolist())):
+            lists[label][item_id] = snapshot[item_id]
+            assignment[item_id] = label
+            if position % 1000 == 999:
+                time.sleep(0)
+        packed = {}
+        for list_id, members in enumerate(lists):
+            if members:
+                packed[list_id] = (list(members.keys()), np.stack(list(members.values())))
+                time.sleep(0)
+
+        with self._lock:
+            # Replay changes that happened while training ran on the snapshot
+            for item_id in self._changed_while_training:
+                old_list = assignment.pop(item_id, None)
+                if old_list is not None:
+                    lists[old_list].pop(item_id, None)
+                    packed.pop(old_list, None)
+                vector = self._vectors.get(item_id)
+                if vector is not None:
+                    new_list = int(np.argmax(centroids @ vector))
+                    lists[new_list][item_id] = vector
+                    assignment[item_id] = new_list
+                    packed.pop(new_list, None)
+            self._changed_while_training = set()
+
+            self.centroids = centroids
+            self._lists = lists
+            self._assignment = assignment
+            self._packed = packed
+            self._trained_size = len(ids)
+        logger.info(f"Trained profile index with {n_lists} lists over {len(ids)} profiles")
+
+
+class ProfileSimilarityIndex:
+    """Keeps profile vectors in an IVF index in sync with the user data we see"""
+
+    def __init__(self, dim: int = 256, n_lists: int = 16, n_probe: int = 4, rescan_interval: float = 30.0):
+        self.dim = dim
+        self.index = IVFIndex(dim, n_lists=n_lists, n_probe=n_probe)
+        # Raw profile fields last indexed per user, compared before doing any feature work
+        self._fingerprints: Dict[str, Tuple[Any, ...]] = {}
+        self._sync_cursor = 0
+        # A pass visits every profile once; a new pass starts at most every `rescan_interval` seconds
+        self.rescan_interval = rescan_interval
+        self._pass_seen: set = set()
+        self._pass_visited = 0
+        self._next_pass_at = 0.0
+
+    def vectorize(self, profile: Dict[str, Any]) -> Optional[np.ndarray]:
+        return hash_features(profile_features(profile), self.dim)
+
+    def update_profile(self, profile: Dict[str, Any]) -> bool:
+        """Re-index a profile if its similarity fields changed. Returns True when the index was touched."""
+        user_id = profile.get("id")
+        if not user_id:
+            return False
+        fingerprint = self._fingerprint(profile)
+        if self._fingerprints.get(user_id) == fingerprint:
+            return False
+        self._fingerprints[user_id] = fingerprint
+        vector = self.vectorize(profile)
+        if vector is None:
+            self.index.remove(user_id)
+        else:
+            self.index.upsert(user_id, vector)
+        return True
+
+    def remove_profile(self, user_id: str):
+        self._fingerprints.pop(user_id, None)
+        self.index.remove(user_id)
+
+    def sync(self, profiles: List[Dict[str, Any]], deadline: Optional[float] = None) -> int:
+        """
+        Apply changed profiles to the index, stopping at `deadline`.
+        Each call resumes where the previous one stopped, so every profile
+        is eventually visited even when one call cannot cover them all.
+        Progress is tracked by id, so profiles added, removed or reordered
+        between calls cannot make a pass skip anyone. When a pass completes,
+        ids missing from the `profiles` of that call are dropped from the index.
+        """
+        updated = 0
+        total = len(profiles)
+        if not total or time.monotonic() < self._next_pass_at:
+            return updated
+
+        # Walk the list from where the last call stopped; positions are only a hint
+        start = self._sync_cursor % total
+        remaining = max(0, total - self._pass_visited)
+        for offset in range(remaining):
+            if deadline is not None and time.perf_counter() > deadline:
+                self._sync_cursor = start + offset
+                self._pass_visited += offset
+                return updated
+            updated += self._visit(profiles[(start + offset) % total])
+        self._sync_cursor = start + remaining
+        self._pass_visited = total
+
+        # Positions may have shifted during the pass; catch up on ids not visited yet
+        for profile in profiles:
+            if profile.get("id") in self._pass_seen:
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                return updated
+            updated += self._visit(profile)
+
+        self._finish_pass({profile.get("id") for profile in profiles})
+        return updated
+
+    def _visit(self, profile: Dict[str, Any]) -> int:
+        user_id = profile.get("id")
+        if user_id in self._pass_seen:
+            return 0
+        self._pass_seen.add(user_id)
+        return 1 if self.update_profile(profile) else 0
+
+    def _finish_pass(self, present_ids: set):
+        stale = [user_id for user_id in self._fingerprints if user_id not in present_ids]
+        for user_id in stale:
+            self.remove_profile(user_id)
+        if stale:
+            logger.info(f"Removed {len(stale)} profiles no longer present from the profile index")
+        self._pass_seen = set()
+        self._pass_visited = 0
+        self._next_pass_at = time.monotonic() + self.rescan_interval
+
+    @staticmethod
+    def _fingerprint(profile: Dict[str, Any]) -> Tuple[Any, ...]:
+        for key in UPDATED_AT_KEYS:
+            updated_at = profile.get(key)
+            if updated_at:
+                return (updated_at,)
+        return tuple(map(profile.get, PROFILE_KEYS))
+
+    def similar(self, profile: Dict[str, Any], k: int, deadline: Optional[float] = None) -> Dict[str, float]:
+        """Map of user id -> cosine similarity for the top-k profiles most similar to `profile`"""
+        vector = self.vectorize(profile)
+        if vector is None:
+            return {}
+        return dict(self.index.search(vector, k, deadline=deadline, exclude=profile.get("id")))
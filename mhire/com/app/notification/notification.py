@@ -7,6 +7,12 @@ from pydantic import BaseModel
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from mhire.com.config.config import Config
+from mhire.com.core.metrics import LLM_FALLBACKS, LLM_REQUEST_SECONDS, record_llm_tokens
+from mhire.com.core.resilience import LLMUnavailable, ResilientCaller
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 class Quote(BaseModel):
     quote: str
@@ -24,6 +30,16 @@ class Notification:
         self.scheduler = AsyncIOScheduler()
         self.quotes_history: List[Quote] = []
         
+        # Timeout, hedging and circuit breaker around the upstream LLM
+        self.llm_caller = ResilientCaller(
+            "notification",
+            timeout=self.config.LLM_TIMEOUT_SECONDS,
+            hedge_percentile=self.config.LLM_HEDGE_PERCENTILE,
+            hedge_ratio=self.config.LLM_HEDGE_RATIO,
+            failure_threshold=self.config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.config.CIRCUIT_RESET_SECONDS
+        )
+        
         # Start the scheduler
         self.scheduler.add_job(
             self.store_daily_quote,
@@ -66,16 +82,35 @@ class Notification:
             "presence_penalty": 0.6,
             "frequency_penalty": 0.6
         }
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(self.openai_endpoint, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            quote = data["choices"][0]["message"]["content"].strip()
-            return quote
+        return await self.llm_caller.call(lambda: self._request_quote(payload, headers))
+
+    async def _request_quote(self, payload: dict, headers: dict) -> str:
+        """Single upstream request for a quote"""
+        llm_start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=self.config.LLM_TIMEOUT_SECONDS) as client:
+                response = await client.post(self.openai_endpoint, json=payload, headers=headers)
+                response.raise_for_status()
+                data = response.json()
+        except Exception:
+            LLM_REQUEST_SECONDS.labels(service="notification", outcome="error").observe(time.perf_counter() - llm_start)
+            raise
+        LLM_REQUEST_SECONDS.labels(service="notification", outcome="success").observe(time.perf_counter() - llm_start)
+        usage = data.get("usage") or {}
+        record_llm_tokens("notification", usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+        quote = data["choices"][0]["message"]["content"].strip()
+        return quote
 
     async def store_daily_quote(self) -> Quote:
-        """Store and return a new dating suggestion quote"""
-        quote_text = await self.generate_quote()
+        """Store and return a new dating suggestion quote, or the latest one if the LLM is unavailable"""
+        try:
+            quote_text = await self.generate_quote()
+        except LLMUnavailable as e:
+            if not self.quotes_history:
+                raise
+            logger.warning(f"Serving latest stored quote: {e}")
+            LLM_FALLBACKS.labels(service="notification", source="history").inc()
+            return self.quotes_history[-1]
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         quote = Quote(quote=quote_text, timestamp=timestamp)
         self.quotes_history.append(quote)
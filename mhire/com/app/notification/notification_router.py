@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from mhire.com.app.notification.notification import Notification
 from mhire.com.config.config import Config
+from mhire.com.core.admission import AdmissionController, request_priority
 
 config = Config()
 router = APIRouter(
@@ -10,8 +11,16 @@ router = APIRouter(
 )
 
 notification_service = Notification(config)
+generate_admission = AdmissionController(
+    "notification/generate",
+    max_concurrency=config.NOTIFICATION_MAX_CONCURRENCY,
+    max_queue=config.NOTIFICATION_MAX_QUEUE,
+    max_wait=config.NOTIFICATION_MAX_WAIT_SECONDS,
+    initial_service_time=config.NOTIFICATION_EXPECTED_SERVICE_SECONDS,
+)
 
 @router.get("/generate")
-async def generate_now():
+async def generate_now(priority: int = Depends(request_priority)):
     """Generate a new dating suggestion quote"""
-    return await notification_service.store_daily_quote()
+    async with generate_admission.slot(priority):
+        return await notification_service.store_daily_quote()
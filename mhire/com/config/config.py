@@ -14,6 +14,30 @@ class Config:
         self.MODEL = os.getenv("MODEL", "gpt-3.5-turbo")
         self.DB_BASE_URL = os.getenv("DB_BASE_URL")
 
+        # Admission control for LLM-backed endpoints
+        self.CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+        self.CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+        self.CHAT_MAX_WAIT_SECONDS = float(os.getenv("CHAT_MAX_WAIT_SECONDS", "10"))
+        self.CHAT_EXPECTED_SERVICE_SECONDS = float(os.getenv("CHAT_EXPECTED_SERVICE_SECONDS", "3"))
+        self.NOTIFICATION_MAX_CONCURRENCY = int(os.getenv("NOTIFICATION_MAX_CONCURRENCY", "4"))
+        self.NOTIFICATION_MAX_QUEUE = int(os.getenv("NOTIFICATION_MAX_QUEUE", "16"))
+        self.NOTIFICATION_MAX_WAIT_SECONDS = float(os.getenv("NOTIFICATION_MAX_WAIT_SECONDS", "5"))
+        self.NOTIFICATION_EXPECTED_SERVICE_SECONDS = float(os.getenv("NOTIFICATION_EXPECTED_SERVICE_SECONDS", "2"))
+
+        # Deadlines and resilience for upstream LLM calls
+        self.REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+        self.MIN_REQUEST_DEADLINE_SECONDS = float(os.getenv("MIN_REQUEST_DEADLINE_SECONDS", "1"))
+        self.LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+        self.LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.LLM_HEDGE_RATIO = float(os.getenv("LLM_HEDGE_RATIO", "0.1"))
+        self.CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+        # Profile similarity ranking signal for match-making
+        self.SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "50"))
+        self.SIMILARITY_BUDGET_MS = float(os.getenv("SIMILARITY_BUDGET_MS", "20"))
+        self.SIMILARITY_RESCAN_SECONDS = float(os.getenv("SIMILARITY_RESCAN_SECONDS", "30"))
+
         # Other config variables can be added here
 
         # Setup logging configuration
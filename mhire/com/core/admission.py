@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import Request
+
+from mhire.com.core.metrics import ADMISSION_REJECTIONS
+from mhire.com.core.resilience import remaining_time
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+PRIORITY_HEADER = "X-Request-Priority"
+PRIORITY_LANES = {
+    "high": PRIORITY_HIGH,
+    "normal": PRIORITY_NORMAL,
+    "low": PRIORITY_LOW,
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being queued or served"""
+
+    def __init__(self, endpoint: str, status_code: int, retry_after: float, reason: str):
+        super().__init__(f"{endpoint}: {reason}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+def request_priority(request: Request) -> int:
+    """
+    Map the priority header of an incoming request to a lane (defaults to normal).
+    The header is only trusted from internal callers: nginx clears it on public traffic.
+    """
+    lane = request.headers.get(PRIORITY_HEADER, "normal").strip().lower()
+    return PRIORITY_LANES.get(lane, PRIORITY_NORMAL)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded, priority-ordered wait queue.
+
+    At most `max_concurrency` requests run at once. Up to `max_queue` more may
+    wait for a slot, served by priority lane and then arrival order. A request
+    is rejected up front when the queue is full (429) or when the estimated
+    wait already exceeds `max_wait` or the request deadline (503), and rejected
+    if it is still queued once that time has elapsed, so overload turns into fast failures instead
+    of slow ones.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float,
+                 initial_service_time: float = 1.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+
+        self.active = 0
+        self._waiters: List[list] = []  # heap of [priority, seq, future]
+        self._seq = itertools.count()
+
+        # Exponentially weighted moving average of time spent holding a slot,
+        # seeded so a cold-start burst is shed up front instead of timing out in the queue
+        self.avg_service_time: float = initial_service_time
+        self._ewma_alpha = 0.2
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimate_wait(self, priority: int) -> float:
+        """Estimate how long a new request in the given lane would wait for a slot"""
+        if self.active < self.max_concurrency and not self._waiters:
+            return 0.0
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority)
+        return (ahead // self.max_concurrency + 1) * self.avg_service_time
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL):
+        """Hold a concurrency slot for the duration of the block"""
+        await self.acquire(priority)
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_service_time(time.monotonic() - start_time)
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL):
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+
+        # Never queue past the request deadline
+        max_wait = min(self.max_wait, remaining_time())
+        estimated_wait = self.estimate_wait(priority)
+        if estimated_wait > max_wait:
+            raise self._reject(503, estimated_wait, f"estimated wait {estimated_wait:.2f}s exceeds {max_wait:.2f}s")
+
+        if len(self._waiters) >= self.max_queue:
+            # Make room by shedding the newest waiter of a lower priority lane, if any
+            victim = max(self._waiters, default=None)
+            if victim is None or victim[0] <= priority:
+                raise self._reject(429, estimated_wait or self.max_wait, "wait queue is full")
+            self._remove_waiter(victim)
+            victim[2].set_exception(
+                self._reject(503, estimated_wait or self.max_wait, "displaced by a higher priority request")
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as the deadline expired
+                return
+            self._remove_waiter(entry)
+            raise self._reject(503, self.avg_service_time, "timed out waiting for a slot")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                self._remove_waiter(entry)
+            raise
+
+    def release(self):
+        """Hand the slot to the next live waiter, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove_waiter(self, entry: list):
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+    def _record_service_time(self, elapsed: float):
+        self.avg_service_time += self._ewma_alpha * (elapsed - self.avg_service_time)
+
+    def _reject(self, status_code: int, retry_after: float, reason: str) -> AdmissionRejected:
+        logger.warning(
+            f"Shedding request on {self.name} ({status_code}): {reason} "
+            f"[active={self.active}, queued={len(self._waiters)}]"
+        )
+        ADMISSION_REJECTIONS.labels(endpoint=self.name, status=str(status_code)).inc()
+        return AdmissionRejected(self.name, status_code, retry_after, reason)
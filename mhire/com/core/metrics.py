@@ -0,0 +1,76 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Request latency per route template (not per raw path, to keep label cardinality bounded)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    # LLM-backed routes can run up to the 30 s request deadline
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0),
+)
+
+# Per-stage timings inside the match-making pipeline
+MATCH_STAGE_SECONDS = Histogram(
+    "matchmaking_stage_duration_seconds",
+    "Time spent in each match-making stage",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Upstream LLM calls
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Upstream LLM call latency",
+    ["service", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens",
+    "Tokens consumed by upstream LLM calls",
+    ["service", "kind"],
+)
+LLM_HEDGES = Counter(
+    "llm_hedged_requests",
+    "Second attempts sent because the first upstream call was slow",
+    ["service"],
+)
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks",
+    "Responses served from a fallback instead of the upstream LLM",
+    ["service", "source"],
+)
+CIRCUIT_OPEN = Gauge(
+    "llm_circuit_open",
+    "Whether the circuit breaker for an upstream LLM is open or half-open (1) or closed (0)",
+    ["service"],
+)
+
+# In-process caches; hit ratio = hits / (hits + misses)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by result",
+    ["cache", "result"],
+)
+
+# Load shedding
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections",
+    "Requests shed by admission control",
+    ["endpoint", "status"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_llm_tokens(service: str, prompt_tokens: int, completion_tokens: int):
+    if prompt_tokens:
+        LLM_TOKENS.labels(service=service, kind="prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(service=service, kind="completion").inc(completion_tokens)
+
+
+def render_metrics():
+    """Return the exposition payload and its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from mhire.com.core.metrics import CIRCUIT_OPEN, LLM_HEDGES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Absolute time.monotonic() deadline of the request being served, if any
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_request_deadline(seconds: float):
+    """Start the deadline clock for the current request"""
+    _request_deadline.set(time.monotonic() + seconds)
+
+
+def remaining_time() -> float:
+    """Seconds left before the current request's deadline (infinite when none is set)"""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return math.inf
+    return deadline - time.monotonic()
+
+
+class LLMUnavailable(Exception):
+    """Raised when an upstream LLM call fails, times out or is short-circuited"""
+
+    def __init__(self, service: str, reason: str, retry_after: float = 1):
+        super().__init__(f"{service}: {reason}")
+        self.service = service
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def is_client_error(error: BaseException) -> bool:
+    """
+    True for non-retryable 4xx responses (everything but 408 and 429), which say
+    nothing about the provider's health. Handles httpx.HTTPStatusError and OpenAI
+    API errors, which both expose the status code.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status_code, int) and 400 <= status_code < 500 and status_code not in (408, 429)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. After that a single trial call is let through
+    (half-open); its outcome closes the circuit or opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_in_flight = False
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            if self.state != self.OPEN:
+                self._set_state(self.OPEN)
+
+    def release_trial(self):
+        """Forget an in-flight trial call whose outcome will never be known"""
+        self._trial_in_flight = False
+
+    def _set_state(self, state: str):
+        logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_OPEN.labels(service=self.name).set(0 if state == self.CLOSED else 1)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        position = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[position]
+
+
+class ResilientCaller:
+    """
+    Wraps upstream LLM calls with a timeout bounded by the request deadline,
+    a hedged second attempt once the first is slower than the given latency
+    percentile, and a circuit breaker. Every failure surfaces as LLMUnavailable
+    so callers can fall back to cached content.
+
+    Hedges are limited by a token bucket: each call earns `hedge_ratio` tokens
+    (capped at `hedge_burst`) and a hedge spends one, so at most that fraction
+    of calls is ever duplicated, even when the provider slows down across the board.
+    """
+
+    def __init__(self, name: str, timeout: float, hedge_percentile: float = 95,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 hedge_ratio: float = 0.1, hedge_burst: float = 5.0):
+        self.name = name
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self.hedge_ratio = hedge_ratio
+        self.hedge_burst = hedge_burst
+        self._hedge_tokens = 0.0
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run `attempt` (a factory for one upstream request) under the resilience policy"""
+        budget = min(self.timeout, remaining_time())
+        if budget <= 0:
+            raise LLMUnavailable(self.name, "request deadline already expired")
+        if not self.breaker.allow():
+            raise LLMUnavailable(self.name, "circuit open", self.breaker.retry_after())
+
+        # No hedging while probing a half-open circuit
+        hedge = self.breaker.state == CircuitBreaker.CLOSED
+        self._hedge_tokens = min(self.hedge_burst, self._hedge_tokens + self.hedge_ratio)
+        try:
+            result = await asyncio.wait_for(self._hedged(attempt, budget, hedge), timeout=budget)
+        except asyncio.TimeoutError:
+            if budget >= self.timeout:
+                self.breaker.record_failure()
+            else:
+                # The request deadline cut the call short; that says nothing about the upstream
+                self.breaker.release_trial()
+            raise LLMUnavailable(self.name, f"timed out after {budget:.1f}s", self.breaker.retry_after())
+        except Exception as e:
+            if is_client_error(e):
+                # A bad request (e.g. context too long) is our problem, not the provider's
+                self.breaker.release_trial()
+                logger.warning(f"Upstream call {self.name} rejected the request: {e}")
+                raise LLMUnavailable(self.name, str(e)) from e
+            self.breaker.record_failure()
+            logger.error(f"Upstream call {self.name} failed: {e}")
+            raise LLMUnavailable(self.name, str(e), self.breaker.retry_after()) from e
+        except asyncio.CancelledError:
+            # The client went away; release a half-open trial without judging the upstream
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[T]], budget: float, hedge: bool) -> T:
+        hedge_delay = self.latency.percentile(self.hedge_percentile) if hedge else None
+        first_start = time.monotonic()
+        first = asyncio.ensure_future(attempt())
+        # The tracker only sees the first attempt's own latency; a faster hedge must not pull it down
+        first.add_done_callback(
+            lambda task: self.latency.record(time.monotonic() - first_start)
+            if not task.cancelled() and task.exception() is None else None
+        )
+        tasks = {first}
+        try:
+            if hedge_delay is not None and hedge_delay < budget:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done and self._hedge_tokens < 1:
+                    logger.info(f"Hedge budget for {self.name} exhausted, not hedging")
+                elif not done:
+                    self._hedge_tokens -= 1
+                    LLM_HEDGES.labels(service=self.name).inc()
+                    logger.info(f"Hedging {self.name} call after {hedge_delay:.2f}s")
+                    tasks.add(asyncio.ensure_future(attempt()))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            if not first.done():
+                # Cancelled because the hedge won: its latency is at least the time elapsed so far
+                self.latency.record(time.monotonic() - first_start)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -1,11 +1,15 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from mhire.com.app.match_making.match_making_router import router as match_making_router
 from mhire.com.app.date_mate.date_mate_router import router as date_mate_router
 from mhire.com.app.notification.notification_router import router as notification_router
 from mhire.com.config.config import Config
+from mhire.com.core.admission import AdmissionRejected
+from mhire.com.core.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from mhire.com.core.resilience import DEADLINE_HEADER, LLMUnavailable, set_request_deadline
 import logging
+import time
 
 config = Config()
 app = FastAPI(
@@ -23,11 +27,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request latency per route template
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - start_time)
+
+# Start the request deadline clock; clients may ask for a shorter one, down to a floor
+@app.middleware("http")
+async def propagate_deadline(request: Request, call_next):
+    deadline = config.REQUEST_DEADLINE_SECONDS
+    try:
+        deadline = min(deadline, float(request.headers.get(DEADLINE_HEADER, deadline)))
+    except ValueError:
+        pass
+    if not deadline >= config.MIN_REQUEST_DEADLINE_SECONDS:  # also rejects NaN
+        deadline = config.MIN_REQUEST_DEADLINE_SECONDS
+    set_request_deadline(deadline)
+    return await call_next(request)
+
 # Include routers
 app.include_router(match_making_router)
 app.include_router(date_mate_router)
 app.include_router(notification_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+# Load shedding: fail fast with a retry hint instead of a slow 500
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": "Service is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Upstream LLM unavailable and no fallback to serve
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailable):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Upstream model unavailable, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):